@@ -219,13 +219,12 @@ async def process_scan_background(scan_id: int):
                 # Process each detection
                 scan.progress_message = f"Processing image {idx} of {len(images)}: Matching detected badges..."
                 db.commit()
-                for detection in detection_result.detections:
-                    # Match badge name to database
-                    match = matcher_service.match_badge_name(
-                        detected_name=detection.badge_name,
-                        ollama_confidence=detection.confidence_score,
-                    )
-
+                # Match badge names to database, streaming matches as they are scored
+                matches = matcher_service.iter_matches(
+                    (d.badge_name, d.confidence_score)
+                    for d in detection_result.detections
+                )
+                for detection, match in zip(detection_result.detections, matches):
                     if match.matched:
                         # Get database badge ID
                         badge = db.query(Badge).filter(
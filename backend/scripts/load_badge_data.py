@@ -28,6 +28,9 @@ sys.path.insert(0, str(project_root))
 from backend.config import BadgeConfig, DatabaseConfig
 from backend.models.database import Badge, Inventory, InventoryAdjustment
 
+# Number of new badges flushed to the database at a time
+BATCH_SIZE = 1000
+
 
 def load_scoutshop_urls(scoutshop_urls_path: Path) -> dict:
     """
@@ -58,6 +61,47 @@ def load_scoutshop_urls(scoutshop_urls_path: Path) -> dict:
     return url_mapping
 
 
+def flush_new_badges(
+    session: Session,
+    new_badges: list[Badge],
+    default_threshold: int,
+) -> int:
+    """
+    Flush a batch of new badges with their inventory records.
+
+    The flushed objects are expunged afterwards so the session does not keep
+    every loaded badge alive until commit.
+
+    Args:
+        session: Active database session
+        new_badges: New Badge objects to insert
+        default_threshold: Default reorder threshold for inventory
+
+    Returns:
+        Number of inventory records created
+    """
+    # Flush badges first so their IDs are available
+    session.add_all(new_badges)
+    session.flush()
+
+    inventory = [
+        Inventory(
+            badge_id=badge.id,
+            quantity=0,
+            reorder_threshold=default_threshold,
+            notes=f"Initialized with threshold {default_threshold}",
+        )
+        for badge in new_badges
+    ]
+    session.add_all(inventory)
+    session.flush()
+
+    for obj in (*new_badges, *inventory):
+        session.expunge(obj)
+
+    return len(inventory)
+
+
 def load_badge_data(
     database_url: str,
     badge_data_path: Path,
@@ -117,17 +161,27 @@ def load_badge_data(
                 session.commit()
                 print("Existing data cleared")
 
+            # Fetch existing badges once, keyed by badge_id
+            existing_badges = {
+                badge.badge_id: badge for badge in session.scalars(select(Badge))
+            }
+            pending_badges = {}
+            # Primary keys of new badges already flushed (and expunged)
+            flushed_pks = {}
+            badges_updated = 0
+            badges_skipped = 0
+
             # Load each badge
             for badge_data in badges_data:
                 badge_id = badge_data.get("id")
                 if not badge_id:
-                    print(f"Warning: Skipping badge with no ID: {badge_data.get('name', 'Unknown')}")
+                    badges_skipped += 1
                     continue
 
-                # Check if badge already exists
-                existing_badge = session.scalar(
-                    select(Badge).where(Badge.badge_id == badge_id)
-                )
+                existing_badge = existing_badges.get(badge_id) or pending_badges.get(badge_id)
+                if existing_badge is None and badge_id in flushed_pks:
+                    # Duplicate of a badge added in an earlier batch
+                    existing_badge = session.get(Badge, flushed_pks[badge_id])
 
                 if existing_badge:
                     # Update existing badge
@@ -141,7 +195,7 @@ def load_badge_data(
                     if badge_id in scoutshop_urls:
                         existing_badge.scoutshop_url = scoutshop_urls[badge_id]
 
-                    print(f"Updated badge: {existing_badge.name}")
+                    badges_updated += 1
                 else:
                     # Create new badge
                     badge = Badge(
@@ -154,26 +208,31 @@ def load_badge_data(
                         size_mm=badge_data.get("estimated_size_mm", 40),
                         placement=badge_data.get("placement", ""),
                     )
-                    session.add(badge)
-                    badges_loaded += 1
-                    print(f"Added badge: {badge.name}")
-
-                    # Create inventory record for new badge
-                    session.flush()  # Ensure badge.id is available
-
-                    inventory = Inventory(
-                        badge_id=badge.id,
-                        quantity=0,
-                        reorder_threshold=default_threshold,
-                        notes=f"Initialized with threshold {default_threshold}",
-                    )
-                    session.add(inventory)
-                    inventory_created += 1
+                    pending_badges[badge_id] = badge
+
+                    if len(pending_badges) >= BATCH_SIZE:
+                        inventory_created += flush_new_badges(
+                            session, list(pending_badges.values()), default_threshold
+                        )
+                        badges_loaded += len(pending_badges)
+                        flushed_pks.update(
+                            (key, badge.id) for key, badge in pending_badges.items()
+                        )
+                        pending_badges.clear()
+
+            if pending_badges:
+                inventory_created += flush_new_badges(
+                    session, list(pending_badges.values()), default_threshold
+                )
+                badges_loaded += len(pending_badges)
 
             # Commit all changes
             session.commit()
             print(f"\n✅ Successfully loaded {badges_loaded} badges")
             print(f"✅ Created {inventory_created} inventory records")
+            print(f"Updated {badges_updated} existing badges")
+            if badges_skipped:
+                print(f"Warning: Skipped {badges_skipped} badges with no ID")
 
         except Exception as e:
             session.rollback()
@@ -7,9 +7,11 @@ against the known badge database using fuzzy string matching algorithms.
 
 import logging
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from typing import Optional
 
+import orjson
 from rapidfuzz import fuzz, process
 
 # Configure logging
@@ -51,6 +53,10 @@ class BadgeMatch:
             "category": self.category,
         }
 
+    def to_json(self) -> bytes:
+        """Serialize match to JSON bytes (same shape as to_dict)."""
+        return orjson.dumps(self)
+
     @property
     def is_high_confidence(self) -> bool:
         """Check if match is high confidence (>= 0.9)."""
@@ -100,6 +106,18 @@ class BadgeMatcherService:
             for badge_id, name in self.badge_names.items()
         }
 
+        # Normalized name lengths for the fuzzy matching length prefilter
+        self._name_lens = {
+            badge_id: len(name)
+            for badge_id, name in self.normalized_names.items()
+        }
+
+        # Token-sorted names so token_sort_ratio reduces to a plain ratio
+        self._token_sorted_names = {
+            badge_id: self._token_sort(name)
+            for badge_id, name in self.normalized_names.items()
+        }
+
         # Build abbreviation mappings
         self.abbreviations = self._build_abbreviation_map()
 
@@ -147,6 +165,19 @@ class BadgeMatcherService:
 
         return normalized
 
+    @staticmethod
+    def _token_sort(name: str) -> str:
+        """
+        Sort the whitespace-separated tokens of a name.
+
+        Args:
+            name: Normalized badge name
+
+        Returns:
+            Name with its tokens in sorted order
+        """
+        return " ".join(sorted(name.split()))
+
     def _build_abbreviation_map(self) -> dict[str, list[str]]:
         """
         Build mapping of common abbreviations to full badge IDs.
@@ -256,22 +287,37 @@ class BadgeMatcherService:
         # Perform fuzzy matching against all badges
         best_match = None
         best_score = 0.0
+        detected_len = len(normalized_detected)
+        sorted_detected = self._token_sort(normalized_detected)
 
         for badge_id, normalized_name in self.normalized_names.items():
+            # Apply category boost if applicable
+            boost = 0.0
+            if category_hint:
+                badge_category = self.badges[badge_id].get("category", "")
+                if category_hint.lower() in badge_category.lower():
+                    boost = self.category_boost
+
+            # Length prefilter: InDel distance is at least the length difference,
+            # which caps token_sort_ratio. Skip candidates that cannot beat the
+            # current best even with perfect token_set and partial scores.
+            total_len = self._name_lens[badge_id] + detected_len
+            if total_len:
+                max_sort_score = 100.0 * (1 - abs(self._name_lens[badge_id] - detected_len) / total_len)
+                if max_sort_score * 0.5 + 50.0 + boost <= best_score:
+                    continue
+
             # Calculate fuzzy match score using multiple algorithms
-            token_sort_score = fuzz.token_sort_ratio(normalized_detected, normalized_name)
+            token_sort_score = fuzz.ratio(sorted_detected, self._token_sorted_names[badge_id])
             token_set_score = fuzz.token_set_ratio(normalized_detected, normalized_name)
             partial_score = fuzz.partial_ratio(normalized_detected, normalized_name)
 
             # Use weighted average of scores
             score = (token_sort_score * 0.5 + token_set_score * 0.3 + partial_score * 0.2)
 
-            # Apply category boost if applicable
-            if category_hint:
-                badge_category = self.badges[badge_id].get("category", "")
-                if category_hint.lower() in badge_category.lower():
-                    score += self.category_boost
-                    logger.debug(f"Applied category boost to {badge_id}: {score}")
+            if boost:
+                score += boost
+                logger.debug(f"Applied category boost to {badge_id}: {score}")
 
             if score > best_score:
                 best_score = score
@@ -318,27 +364,43 @@ class BadgeMatcherService:
                 category=None,
             )
 
-    def match_batch(
+    def iter_matches(
         self,
-        detections: list[tuple[str, float]],
+        detections: Iterable[tuple[str, float]],
+        category_hint: Optional[str] = None,
+    ) -> Iterator[BadgeMatch]:
+        """
+        Lazily match multiple detected badge names.
+
+        Matches are yielded one at a time so callers can start consuming
+        results (e.g. writing to the database) before the whole batch is done.
+
+        Args:
+            detections: Iterable of (name, confidence) tuples
+            category_hint: Optional category hint for all matches
+
+        Yields:
+            BadgeMatch objects in the same order as the detections
+        """
+        for name, confidence in detections:
+            yield self.match_badge_name(name, confidence, category_hint)
+
+    def match_batch_list(
+        self,
+        detections: Iterable[tuple[str, float]],
         category_hint: Optional[str] = None,
     ) -> list[BadgeMatch]:
         """
         Match multiple detected badge names.
 
         Args:
-            detections: List of (name, confidence) tuples
+            detections: Iterable of (name, confidence) tuples
             category_hint: Optional category hint for all matches
 
         Returns:
             List of BadgeMatch objects
         """
-        matches = []
-        for name, confidence in detections:
-            match = self.match_badge_name(name, confidence, category_hint)
-            matches.append(match)
-
-        return matches
+        return list(self.iter_matches(detections, category_hint))
 
     def get_badge_suggestions(
         self,
@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import Optional
 
 import ollama
+import orjson
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -77,6 +78,10 @@ class DetectionResult:
             "error": self.error,
         }
 
+    def to_json(self) -> bytes:
+        """Serialize result to JSON bytes (same shape as to_dict)."""
+        return orjson.dumps(self)
+
 
 class BadgeRecognitionService:
     """
@@ -344,16 +349,18 @@ No badges detected | 0 | low
         self,
         image_paths: list[str],
         progress_callback: Optional[callable] = None,
-    ) -> list[DetectionResult]:
+        serialize: bool = False,
+    ) -> list[DetectionResult] | list[bytes]:
         """
         Detect badges in multiple images with progress tracking.
 
         Args:
             image_paths: List of image file paths
             progress_callback: Optional callback function(current, total, result)
+            serialize: Return JSON-encoded bytes instead of DetectionResult objects
 
         Returns:
-            List of DetectionResult objects
+            List of DetectionResult objects, or JSON bytes if serialize is True
         """
         results = []
         total = len(image_paths)
@@ -364,7 +371,7 @@ No badges detected | 0 | low
             logger.info(f"Processing image {idx}/{total}")
 
             result = self.detect_badges(image_path)
-            results.append(result)
+            results.append(result.to_json() if serialize else result)
 
             # Call progress callback if provided
             if progress_callback:
@@ -415,7 +422,8 @@ async def detect_badges_batch(
     badge_names: Optional[list[str]] = None,
     model: str = "llava:7b",
     progress_callback: Optional[callable] = None,
-) -> list[DetectionResult]:
+    serialize: bool = False,
+) -> list[DetectionResult] | list[bytes]:
     """
     Convenience function to detect badges in multiple images.
 
@@ -424,9 +432,10 @@ async def detect_badges_batch(
         badge_names: Optional list of known badge names
         model: Ollama model to use
         progress_callback: Optional callback for progress updates
+        serialize: Return JSON-encoded bytes instead of DetectionResult objects
 
     Returns:
-        List of DetectionResult objects
+        List of DetectionResult objects, or JSON bytes if serialize is True
 
     Example:
         >>> results = await detect_badges_batch([
@@ -435,4 +444,4 @@ async def detect_badges_batch(
         ... ])
     """
     service = BadgeRecognitionService(model=model, badge_names=badge_names)
-    return await service.detect_badges_batch(image_paths, progress_callback)
+    return await service.detect_badges_batch(image_paths, progress_callback, serialize)
@@ -4,13 +4,17 @@ Database initialization script for Scout Badge Inventory application.
 This script creates all database tables and optionally loads initial badge data.
 """
 
-import json
 import sys
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+import ijson
+import orjson
+from sqlalchemy import Insert, create_engine, event, inspect, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.types import SchemaType
 
 # Add backend to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -18,123 +22,271 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from backend.config import BadgeConfig, DatabaseConfig
 from backend.models.database import Badge, Base, Inventory
 
+# Number of badges inserted per bulk INSERT while streaming the catalog
+BATCH_SIZE = 1000
 
-def create_tables(database_url: str, echo: bool = False) -> None:
+# Read buffer for the JSON data files (fewer read syscalls than the 8 KB default)
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Dialect-specific insert() constructs that support ON CONFLICT DO NOTHING
+ON_CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def engine_options(database_url: str) -> dict:
     """
-    Create all database tables.
+    Build create_engine keyword arguments tuned for bulk inserts.
+
+    psycopg2 batches executemany calls into VALUES lists; other drivers use
+    the defaults.
+
+    Args:
+        database_url: SQLAlchemy database URL
+
+    Returns:
+        Keyword arguments for create_engine
+    """
+    options = {}
+    if make_url(database_url).get_driver_name() == "psycopg2":
+        options["executemany_mode"] = "values_plus_batch"
+    return options
+
+
+def tune_sqlite_for_bulk_load(engine: Engine) -> None:
+    """
+    Apply SQLite PRAGMAs suited to bulk loading on every new connection.
+
+    synchronous=NORMAL skips the extra fsyncs of FULL, and the larger page
+    cache and in-memory temp store cut disk I/O. These settings last only for
+    the connection; the journal mode is left alone because it would be
+    persisted in the database file. No-op for non-SQLite engines.
+
+    Args:
+        engine: Engine to configure
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def create_init_engine(database_url: str, echo: bool = False) -> Engine:
+    """
+    Create the engine shared by all database initialization steps.
 
     Args:
         database_url: SQLAlchemy database URL
         echo: If True, log all SQL statements
+
+    Returns:
+        Engine configured for bulk loading
     """
-    print(f"Creating database tables at: {database_url}")
-    engine = create_engine(database_url, echo=echo)
-    Base.metadata.create_all(engine)
+    engine = create_engine(database_url, echo=echo, **engine_options(database_url))
+    tune_sqlite_for_bulk_load(engine)
+    return engine
+
+
+def create_tables(engine: Engine, defer_indexes: bool = False) -> None:
+    """
+    Create all database tables.
+
+    With defer_indexes, newly created tables get only their unique indexes
+    (needed for ON CONFLICT); the secondary indexes are built once after the
+    bulk load with create_indexes().
+
+    Args:
+        engine: Database engine
+        defer_indexes: If True, skip non-unique indexes on new tables
+    """
+    print(f"Creating database tables at: {engine.url}")
+
+    if not defer_indexes:
+        Base.metadata.create_all(engine)
+    else:
+        with engine.begin() as conn:
+            inspector = inspect(conn)
+            for table in Base.metadata.sorted_tables:
+                if inspector.has_table(table.name):
+                    continue
+                # CreateTable skips the before_create events that create_all
+                # uses to emit types such as PostgreSQL enums, so create them here
+                for column in table.columns:
+                    if isinstance(column.type, SchemaType):
+                        column.type.create(conn, checkfirst=True)
+                conn.execute(CreateTable(table))
+                for index in table.indexes:
+                    if index.unique:
+                        index.create(conn)
+
     print("Database tables created successfully!")
 
 
+def create_indexes(engine: Engine) -> None:
+    """
+    Create every declared index that is missing from the database.
+
+    Covers the indexes deferred by create_tables() as well as any left
+    behind by an earlier run that failed before reaching this step.
+
+    Args:
+        engine: Database engine
+    """
+    print("Creating missing indexes...")
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def badge_insert_statement(dialect_name: str) -> Insert:
+    """
+    Build the badge INSERT used by the bulk load.
+
+    On SQLite and PostgreSQL, rows whose badge_id already exists are skipped
+    by the database (ON CONFLICT DO NOTHING) and the new primary keys are
+    returned. Other dialects get a plain INSERT ... RETURNING.
+
+    Args:
+        dialect_name: Name of the database dialect (e.g. "sqlite")
+
+    Returns:
+        Insert statement returning (id, badge_id) for inserted rows
+    """
+    badges = Badge.__table__
+    insert_factory = ON_CONFLICT_INSERTS.get(dialect_name)
+    if insert_factory is None:
+        stmt = badges.insert()
+    else:
+        stmt = insert_factory(badges).on_conflict_do_nothing(index_elements=["badge_id"])
+    return stmt.returning(badges.c.id, badges.c.badge_id)
+
+
+def create_missing_inventory(conn: Connection, default_threshold: int) -> int:
+    """
+    Create inventory records for every badge that does not have one.
+
+    Runs as a single INSERT ... SELECT from the badges table.
+
+    Args:
+        conn: Database connection with an open transaction
+        default_threshold: Default reorder threshold for inventory
+
+    Returns:
+        Number of inventory records created
+    """
+    badges = Badge.__table__.c
+    inventory = Inventory.__table__
+    stmt = inventory.insert().from_select(
+        ["badge_id", "quantity", "reorder_threshold", "notes"],
+        select(
+            badges.id,
+            literal(0),
+            literal(default_threshold),
+            literal("Initial inventory record"),
+        ).where(~badges.id.in_(select(inventory.c.badge_id))),
+    )
+    return conn.execute(stmt).rowcount
+
+
 def load_badge_data(
-    database_url: str,
+    engine: Engine,
     badge_data_path: Path,
     scoutshop_urls_path: Optional[Path] = None,
     default_threshold: int = 5,
-) -> None:
+) -> tuple[int, int]:
     """
     Load badge data from JSON file into the database.
 
+    Badges are stream-parsed from the JSON array and inserted in batches of
+    BATCH_SIZE, so memory use does not grow with the size of the catalog.
+
     Args:
-        database_url: SQLAlchemy database URL
+        engine: Database engine
         badge_data_path: Path to badges_list.json file
         scoutshop_urls_path: Optional path to scoutshop_urls.json file
         default_threshold: Default reorder threshold for inventory
+
+    Returns:
+        Tuple of (badges in the data file, badge records created)
     """
     print(f"\nLoading badge data from: {badge_data_path}")
 
     # Load badge data
     if not badge_data_path.exists():
         print(f"Error: Badge data file not found at {badge_data_path}")
-        return
-
-    with open(badge_data_path, "r") as f:
-        badges_data = json.load(f)
-
-    print(f"Found {len(badges_data)} badges to load")
+        return 0, 0
 
     # Load ScoutShop URLs if available
     scoutshop_urls = {}
     if scoutshop_urls_path and scoutshop_urls_path.exists():
         print(f"Loading ScoutShop URLs from: {scoutshop_urls_path}")
-        with open(scoutshop_urls_path, "r") as f:
-            scoutshop_data = json.load(f)
+        with open(scoutshop_urls_path, "rb", buffering=READ_BUFFER_SIZE) as f:
+            scoutshop_data = orjson.loads(f.read())
             # Extract badge URLs from the nested structure
             badge_urls = scoutshop_data.get("badge_product_urls", {})
-            for badge_id, url_data in badge_urls.items():
-                if isinstance(url_data, dict):
-                    # Get the main URL (could be 'url' or 'main_badge')
-                    scoutshop_urls[badge_id] = url_data.get("url") or url_data.get("main_badge")
-                else:
-                    scoutshop_urls[badge_id] = url_data
+            # Dict entries hold the main URL under 'url' or 'main_badge'
+            scoutshop_urls = {
+                badge_id: (url_data.get("url") or url_data.get("main_badge"))
+                if isinstance(url_data, dict) else url_data
+                for badge_id, url_data in badge_urls.items()
+            }
         print(f"Loaded {len(scoutshop_urls)} ScoutShop URLs")
 
-    # Create database session
-    engine = create_engine(database_url)
-    session = Session(engine)
-
+    # The bulk load uses Core directly, bypassing the ORM
     try:
-        badges_created = 0
-        inventory_created = 0
-
-        for badge_data in badges_data:
-            badge_id = badge_data.get("id")
-
-            # Check if badge already exists
-            existing_badge = (
-                session.query(Badge).filter(Badge.badge_id == badge_id).first()
-            )
-
-            if existing_badge:
-                print(f"Badge '{badge_id}' already exists, skipping...")
-                continue
-
-            # Create badge record
-            badge = Badge(
-                badge_id=badge_id,
-                name=badge_data.get("name"),
-                category=badge_data.get("category"),
-                description=badge_data.get("description"),
-                image_path=f"data/badges/{badge_id}.png",
-                scoutshop_url=scoutshop_urls.get(badge_id),
-                size_mm=badge_data.get("estimated_size_mm"),
-                placement=badge_data.get("placement"),
-            )
-            session.add(badge)
-            session.flush()  # Get the badge.id
-            badges_created += 1
-
-            # Create inventory record with default threshold
-            inventory = Inventory(
-                badge_id=badge.id,
-                quantity=0,
-                reorder_threshold=default_threshold,
-                notes="Initial inventory record",
-            )
-            session.add(inventory)
-            inventory_created += 1
-
-        # Commit all changes
-        session.commit()
+        # One BEGIN/COMMIT for the whole load; rolls back on error
+        with engine.begin() as conn, open(badge_data_path, "rb", buffering=READ_BUFFER_SIZE) as f:
+            badge_insert = badge_insert_statement(conn.dialect.name)
+
+            badges_seen = 0
+            badges_created = 0
+            badge_rows = []
+
+            for badge_data in ijson.items(f, "item"):
+                badges_seen += 1
+
+                badge_id = badge_data.get("id")
+                badge_rows.append({
+                    "badge_id": badge_id,
+                    "name": badge_data.get("name"),
+                    "category": badge_data.get("category"),
+                    "description": badge_data.get("description"),
+                    "image_path": f"data/badges/{badge_id}.png",
+                    "scoutshop_url": scoutshop_urls.get(badge_id),
+                    "size_mm": badge_data.get("estimated_size_mm"),
+                    "placement": badge_data.get("placement"),
+                })
+
+                if len(badge_rows) >= BATCH_SIZE:
+                    # Existing badges are skipped by the database; only new rows come back
+                    badges_created += len(conn.execute(badge_insert, badge_rows).all())
+                    badge_rows.clear()
+
+            if badge_rows:
+                badges_created += len(conn.execute(badge_insert, badge_rows).all())
+
+            # Derive inventory records for the new badges in one statement
+            inventory_created = create_missing_inventory(conn, default_threshold)
 
         print(f"\nSuccessfully created:")
         print(f"  - {badges_created} badge records")
         print(f"  - {inventory_created} inventory records")
         print(f"  - Default reorder threshold: {default_threshold}")
+        print(f"Skipped {badges_seen - badges_created} existing badges")
+
+        return badges_seen, badges_created
 
     except Exception as e:
-        session.rollback()
         print(f"\nError loading badge data: {e}")
         raise
-    finally:
-        session.close()
 
 
 def main() -> None:
@@ -150,22 +302,30 @@ def main() -> None:
     db_path = Path(database_url.replace("sqlite:///", ""))
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Create tables
-    create_tables(database_url, echo=False)
+    # One engine (and connection pool) for every initialization step
+    engine = create_init_engine(database_url, echo=False)
 
-    # Load badge data
-    load_badge_data(
-        database_url=database_url,
-        badge_data_path=BadgeConfig.BADGE_DATA_FILE,
-        scoutshop_urls_path=BadgeConfig.SCOUTSHOP_URLS_FILE,
-        default_threshold=BadgeConfig.DEFAULT_REORDER_THRESHOLD,
-    )
+    try:
+        # Create tables; secondary indexes are built after the bulk load
+        create_tables(engine, defer_indexes=True)
+
+        # Load badge data
+        total_badges, new_badges = load_badge_data(
+            engine=engine,
+            badge_data_path=BadgeConfig.BADGE_DATA_FILE,
+            scoutshop_urls_path=BadgeConfig.SCOUTSHOP_URLS_FILE,
+            default_threshold=BadgeConfig.DEFAULT_REORDER_THRESHOLD,
+        )
+        create_indexes(engine)
+    finally:
+        engine.dispose()
 
     print("\n" + "=" * 60)
     print("Database initialization complete!")
     print("=" * 60)
     print(f"\nDatabase location: {db_path}")
-    print(f"Total badges loaded: {len(json.load(open(BadgeConfig.BADGE_DATA_FILE)))}")
+    print(f"Total badges loaded: {total_badges}")
+    print(f"New badges inserted: {new_badges}")
     print("\nYou can now start the API server:")
     print("  cd backend")
     print("  python main.py")
@@ -4,17 +4,34 @@ Badge Image Downloader Script
 
 This script reads the `badge_images_metadata.json` file, downloads the badge images
 from the specified URLs, and saves them to the `data/badges` directory.
+Response validators and file hashes are kept in a local cache file next to the
+metadata, so the tracked metadata file itself is never rewritten.
 
 Usage:
-    python scripts/download_badge_images.py
+    python scripts/download_badge_images.py [--force] [--workers N]
+
+Options:
+    --force       Re-check existing images; unchanged ones are not downloaded again
+    --workers N   Number of concurrent downloads (default: 6)
 """
 
 
-import json
+import argparse
+import hashlib
+import os
+import shutil
 import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+import orjson
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
@@ -22,47 +39,464 @@ sys.path.insert(0, str(project_root))
 
 from backend.config import BadgeConfig
 
-def download_image(url: str, dest_path: Path, timeout: int = 10) -> bool:
+# Default number of images downloaded concurrently
+MAX_WORKERS = 6
+
+# Maximum rate at which new downloads are started, to be respectful to the server
+REQUESTS_PER_SECOND = 5.0
+
+# Lowest rate the limiter backs off to when the server throttles us
+MIN_REQUESTS_PER_SECOND = 0.5
+
+# Consecutive successful downloads before the rate is raised again
+RATE_RECOVERY_SUCCESSES = 100
+
+# Buffer size used when copying response bodies to disk
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Downloads between cache checkpoints, so an interrupted run keeps its progress
+CHECKPOINT_INTERVAL = 50
+
+# Local (gitignored) cache of ETag/Last-Modified validators and file hashes,
+# keyed by image path
+DOWNLOAD_CACHE_FILE = project_root / "data" / "badge_images_cache.json"
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting how often requests are started.
+
+    Callers only block when the configured rate is exceeded, instead of
+    sleeping a fixed interval after every request. The rate adapts to the
+    server: it is halved whenever a request is throttled (HTTP 429) and
+    raised by one request per second after a run of successes, up to the
+    configured maximum.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = MIN_REQUESTS_PER_SECOND):
+        """
+        Args:
+            rate: Tokens added per second; also the maximum adaptive rate.
+            burst: Maximum number of tokens that can accumulate.
+            min_rate: Lowest rate reached by repeated throttling.
+        """
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.capacity = burst
+        self._successes = 0
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self) -> None:
+        """Halve the request rate after the server responded with HTTP 429."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._successes = 0
+
+    def succeeded(self) -> None:
+        """Record a successful request, raising the rate after a run of successes."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= RATE_RECOVERY_SUCCESSES:
+                self.rate = min(self.max_rate, self.rate + 1)
+                self._successes = 0
+
+class HashingWriter:
+    """
+    File wrapper that feeds every written block into a hash.
+
+    Lets the SHA-256 of a download be computed while it is streamed to disk,
+    instead of re-reading the file afterwards.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self.hash = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.hash.update(data)
+        return self._f.write(data)
+
+def create_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """
+    Create a pooled keep-alive session shared by all downloads.
+
+    Reusing one connection pool avoids a new TCP+TLS handshake per image,
+    and transient gateway errors are retried with backoff.
+
+    Args:
+        pool_size: Connections kept per host; should match the number of workers.
+
+    Returns:
+        A configured requests Session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        # Back off on throttling and server errors, honouring Retry-After
+        max_retries=Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            # Hand back the last response instead of raising once retries run
+            # out, so throttling can be read from the retry history
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # Some URLs might be for product pages, not direct image links.
+    # This is a best-effort attempt to download.
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Connection': 'keep-alive',
+    })
+    # Advertise every encoding urllib3 can decode (br when brotli is installed);
+    # many metadata URLs are HTML product pages that compress well
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
+
+def download_image(
+    session: requests.Session,
+    url: str,
+    dest_path: Path,
+    cache_entry: dict,
+    conditional: bool = False,
+    limiter: Optional[RateLimiter] = None,
+    timeout: int = 10,
+) -> str:
     """
     Download an image from a URL and save it to a destination path.
 
+    The response's ETag and Last-Modified headers and the SHA-256 of the
+    image are stored in cache_entry.
+    For a conditional request they are sent back as If-None-Match and
+    If-Modified-Since, so an unchanged image costs only a 304 response.
+
     Args:
+        session: The shared requests session.
         url: The URL of the image to download.
         dest_path: The path to save the image to.
+        cache_entry: Cached validators and hash for this image; updated in place.
+        conditional: If True, only download the image if it changed.
+        limiter: Rate limiter to notify of throttled and successful requests.
         timeout: The timeout for the request in seconds.
 
     Returns:
-        True if the download was successful, False otherwise.
+        "downloaded", "not_modified" or "failed".
     """
+    headers = {}
+    if conditional:
+        if cache_entry.get("etag"):
+            headers["If-None-Match"] = cache_entry["etag"]
+        if cache_entry.get("last_modified"):
+            headers["If-Modified-Since"] = cache_entry["last_modified"]
+
     try:
         # Ensure the destination directory exists
         dest_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Some URLs might be for product pages, not direct image links.
-        # This is a best-effort attempt to download.
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        print(f"  Downloading from: {url}")
-        response = requests.get(url, stream=True, timeout=timeout, headers=headers)
+        response = session.get(url, headers=headers, stream=True, timeout=timeout)
+        if limiter:
+            # urllib3 retries 429s itself; its history shows whether we were throttled
+            retries = response.raw.retries
+            if retries and any(attempt.status == 429 for attempt in retries.history):
+                limiter.throttled()
+            elif response.ok or response.status_code == 304:
+                limiter.succeeded()
+
+        if response.status_code == 304:
+            response.close()
+            return "not_modified"
         response.raise_for_status()
 
-        with open(dest_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        return True
+        # Let urllib3 undo any Content-Encoding, then copy in large blocks.
+        # Write to a .part file first so an interrupted download never
+        # leaves a truncated image under the final name.
+        response.raw.decode_content = True
+        part_path = dest_path.with_name(dest_path.name + ".part")
+        try:
+            with open(part_path, "wb") as f:
+                writer = HashingWriter(f)
+                shutil.copyfileobj(response.raw, writer, COPY_BUFFER_SIZE)
+            os.replace(part_path, dest_path)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+        cache_entry["file_hash"] = writer.hash.hexdigest()
+        cache_entry["etag"] = response.headers.get("ETag")
+        cache_entry["last_modified"] = response.headers.get("Last-Modified")
+        return "downloaded"
 
     except requests.exceptions.RequestException as e:
-        print(f"  ❌ Error downloading {url}: {e}")
-        return False
+        print(f"{dest_path.name}: ❌ Error downloading {url}: {e}")
+        return "failed"
     except Exception as e:
-        print(f"  ❌ An unexpected error occurred: {e}")
-        return False
+        print(f"{dest_path.name}: ❌ Unexpected error downloading {url}: {e}")
+        return "failed"
+
+def scan_existing_images(images: list[dict]) -> set[Path]:
+    """
+    List the image files that are already on disk.
+
+    Each destination directory is scanned once with os.scandir instead of
+    calling stat() on every image path.
+
+    Args:
+        images: Image entries from the metadata file.
+
+    Returns:
+        Set of absolute paths of existing files.
+    """
+    image_dirs = {
+        (project_root / image_path).parent
+        for image_path in (image_info.get("image_path") for image_info in images)
+        if image_path
+    }
+
+    existing = set()
+    for image_dir in image_dirs:
+        try:
+            with os.scandir(image_dir) as entries:
+                existing.update(Path(entry.path) for entry in entries if entry.is_file())
+        except FileNotFoundError:
+            continue
+    return existing
+
+def process_image(
+    session: requests.Session,
+    limiter: RateLimiter,
+    existing_images: set[Path],
+    cache: dict,
+    position: str,
+    image_info: dict,
+    force: bool = False,
+) -> str:
+    """
+    Download a single badge image described by a metadata entry.
+
+    Args:
+        session: The shared requests session.
+        limiter: Rate limiter shared by all workers.
+        existing_images: Paths of images already on disk.
+        cache: Download cache, keyed by image path.
+        position: Progress label, e.g. "3/64".
+        image_info: Image entry from the metadata file.
+        force: If True, re-check existing images with a conditional request.
+
+    Returns:
+        One of "missing", "exists", "not_modified", "downloaded" or "failed".
+    """
+    badge_id = image_info.get("badge_id")
+    image_url = image_info.get("image_source_url")
+    image_path_str = image_info.get("image_path")
+
+    # Workers print concurrently, so every line names its image
+    label = f"[{position}] {badge_id}"
+
+    if not all([badge_id, image_url, image_path_str]):
+        print(f"{label}: ⏩ Skipping due to missing info.")
+        return "missing"
+
+    image_path = project_root / image_path_str
+
+    exists = image_path in existing_images
+    if exists and not force:
+        print(f"{label}: ⏩ Image already exists. Skipping.")
+        return "exists"
+
+    limiter.acquire()
+    cache_entry = cache.setdefault(image_path_str, {})
+    result = download_image(
+        session, image_url, image_path, cache_entry, conditional=exists, limiter=limiter
+    )
+    if result == "not_modified":
+        print(f"{label}: ⏩ Image not modified on server. Skipping.")
+    elif result == "downloaded":
+        print(f"{label}: ✅ Downloaded {image_url} to {image_path_str}")
+    else:
+        print(f"{label}: ❌ Failed to download {image_url}")
+    return result
+
+def copy_image(
+    source_info: dict,
+    existing_images: set[Path],
+    cache: dict,
+    position: str,
+    image_info: dict,
+    force: bool = False,
+) -> str:
+    """
+    Reuse an image already fetched from the same URL for another badge.
+
+    The file is hard-linked where possible and copied otherwise.
+
+    Args:
+        source_info: Metadata entry whose image holds the URL's content.
+        existing_images: Paths of images already on disk.
+        cache: Download cache, keyed by image path.
+        position: Progress label, e.g. "3/64".
+        image_info: Image entry from the metadata file.
+        force: If True, replace the image even if it already exists.
+
+    Returns:
+        One of "missing", "exists", "copied" or "failed".
+    """
+    badge_id = image_info.get("badge_id")
+    image_path_str = image_info.get("image_path")
+
+    label = f"[{position}] {badge_id}"
+
+    if not all([badge_id, image_path_str]):
+        print(f"{label}: ⏩ Skipping due to missing info.")
+        return "missing"
+
+    image_path = project_root / image_path_str
+    if image_path in existing_images and not force:
+        print(f"{label}: ⏩ Image already exists. Skipping.")
+        return "exists"
+
+    source_path = project_root / source_info["image_path"]
+    try:
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        image_path.unlink(missing_ok=True)
+        try:
+            os.link(source_path, image_path)
+        except OSError:
+            shutil.copyfile(source_path, image_path)
+    except OSError as e:
+        print(f"{label}: ❌ Failed to copy image: {e}")
+        return "failed"
+
+    cache[image_path_str] = dict(cache.get(source_info["image_path"], {}))
+
+    print(f"{label}: ✅ Same URL as {source_info['badge_id']}; copied to {image_path_str}")
+    return "copied"
+
+def process_url_group(
+    session: requests.Session,
+    limiter: RateLimiter,
+    existing_images: set[Path],
+    cache: dict,
+    group: list[tuple[str, dict]],
+    force: bool = False,
+) -> list[str]:
+    """
+    Process all metadata entries that share one source URL.
+
+    The URL is fetched once; the remaining entries reuse the first image
+    that ends up on disk instead of downloading the same content again.
+
+    Args:
+        session: The shared requests session.
+        limiter: Rate limiter shared by all workers.
+        existing_images: Paths of images already on disk.
+        cache: Download cache, keyed by image path.
+        group: (progress label, image entry) pairs with the same URL.
+        force: If True, re-check existing images with a conditional request.
+
+    Returns:
+        Status of each entry, in the order of group.
+    """
+    results = []
+    source_info = None
+    source_changed = False
+    for position, image_info in group:
+        if source_info is None:
+            result = process_image(
+                session, limiter, existing_images, cache, position, image_info, force
+            )
+            if result in ("exists", "not_modified", "downloaded"):
+                source_info = image_info
+                source_changed = result == "downloaded"
+        else:
+            # Existing copies only need replacing when the content changed
+            result = copy_image(
+                source_info, existing_images, cache, position, image_info, force and source_changed
+            )
+        results.append(result)
+    return results
+
+def load_cache(cache_path: Path) -> dict:
+    """
+    Load the download cache, starting empty if it is missing or unreadable.
+
+    Args:
+        cache_path: Path to the cache file.
+
+    Returns:
+        Mapping of image path to its cached validators and file hash.
+    """
+    try:
+        return orjson.loads(cache_path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+def save_cache(cache_path: Path, cache: dict) -> None:
+    """
+    Write the download cache to disk.
+
+    The file is written to a temporary path and renamed over the original,
+    so an interrupted run never leaves half-written JSON behind.
+
+    Args:
+        cache_path: Path to the cache file.
+        cache: Cache to write.
+    """
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(cache))
+    os.replace(tmp_path, cache_path)
+
+def positive_int(value: str) -> int:
+    """
+    argparse type for integers of at least 1.
+
+    Args:
+        value: Command line value.
+
+    Returns:
+        The parsed integer.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 def main():
     """Main function to download badge images."""
+    parser = argparse.ArgumentParser(description="Download badge reference images")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-check existing images; unchanged ones are not downloaded again",
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=MAX_WORKERS,
+        help=f"Number of concurrent downloads (default: {MAX_WORKERS})",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Scout Badge Image Downloader")
     print("=" * 60)
@@ -72,8 +506,7 @@ def main():
         print(f"❌ Error: Metadata file not found at {metadata_path}")
         sys.exit(1)
 
-    with open(metadata_path, "r", encoding="utf-8") as f:
-        metadata = json.load(f)
+    metadata = orjson.loads(metadata_path.read_bytes())
 
     images_to_download = metadata.get("images", [])
     total_images = len(images_to_download)
@@ -89,41 +522,43 @@ def main():
     success_count = 0
     fail_count = 0
     skip_count = 0
+    session = create_session(pool_size=args.workers)
+    limiter = RateLimiter(REQUESTS_PER_SECOND)
+    existing_images = scan_existing_images(images_to_download)
+    cache = load_cache(DOWNLOAD_CACHE_FILE)
 
-    for i, image_info in enumerate(images_to_download):
-        badge_id = image_info.get("badge_id")
-        image_url = image_info.get("image_source_url")
-        image_path_str = image_info.get("image_path")
+    # Many badges share a product page URL; fetch each URL only once
+    url_groups = defaultdict(list)
+    for i, image_info in enumerate(images_to_download, 1):
+        key = image_info.get("image_source_url") or f"#{i}"
+        url_groups[key].append((f"{i}/{total_images}", image_info))
 
-        print(f"Processing {i+1}/{total_images}: {badge_id}")
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        group_results = executor.map(
+            lambda group: process_url_group(
+                session, limiter, existing_images, cache, group, args.force
+            ),
+            url_groups.values(),
+        )
 
-        if not all([badge_id, image_url, image_path_str]):
-            print("  ⏩ Skipping due to missing info.")
-            skip_count += 1
-            continue
+        for result in (result for results in group_results for result in results):
+            if result in ("missing", "exists", "not_modified"):
+                skip_count += 1
+            elif result in ("downloaded", "copied"):
+                success_count += 1
+                if success_count % CHECKPOINT_INTERVAL == 0:
+                    save_cache(DOWNLOAD_CACHE_FILE, cache)
+            else:
+                fail_count += 1
 
-        image_path = project_root / image_path_str
-
-        if image_path.exists():
-            print("  ⏩ Image already exists. Skipping.")
-            skip_count += 1
-            success_count += 1 # Count existing as success
-            continue
-
-        if download_image(image_url, image_path):
-            print(f"  ✅ Successfully downloaded and saved to {image_path_str}")
-            success_count += 1
-        else:
-            print(f"  ❌ Failed to download badge: {badge_id}")
-            fail_count += 1
-        
-        # Be respectful to the server
-        time.sleep(0.5)
+    # Persist ETag/Last-Modified so later --force runs can skip unchanged images
+    if success_count:
+        save_cache(DOWNLOAD_CACHE_FILE, cache)
 
     print("\n" + "=" * 60)
     print("Download Complete!")
     print("=" * 60)
-    print(f"  - ✅ Successful (including existing): {success_count}")
+    print(f"  - ✅ Downloaded: {success_count}")
     print(f"  - ❌ Failed: {fail_count}")
     print(f"  - ⏩ Skipped: {skip_count}")
     print("-" * 60)
@@ -136,18 +571,4 @@ def main():
         print("\nYou may need to download these images manually.")
 
 if __name__ == "__main__":
-    # Check for requests library
-    try:
-        import requests
-    except ImportError:
-        print("="*60)
-        print("❌ Error: The 'requests' library is not installed.")
-        print("Please install it by running:")
-        print("  pip install requests")
-        print("If you are using the backend virtual environment, activate it first:")
-        print("  source backend/venv/bin/activate")
-        print("  pip install requests")
-        print("="*60)
-        sys.exit(1)
-        
     main()
@@ -19,7 +19,11 @@ from PIL import Image
 def create_test_image(filename: str, size: tuple = (800, 600), color: str = "blue") -> None:
     """Create a test image file."""
     img = Image.new("RGB", size, color)
-    img.save(filename)
+    # Favour encode speed over file size; these images are throwaway fixtures
+    if Path(filename).suffix.lower() == ".png":
+        img.save(filename, compress_level=1)
+    else:
+        img.save(filename, quality=85)
     print(f"Created test image: {filename} ({size[0]}x{size[1]}, {color})")
 
 
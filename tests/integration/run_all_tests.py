@@ -14,16 +14,18 @@ Usage:
     # Or with options
     python tests/integration/run_all_tests.py --quick  # Skip long tests
     python tests/integration/run_all_tests.py --verbose  # More output
+    python tests/integration/run_all_tests.py --batch-size 3  # Images per E2E scan
 """
 
 import argparse
-import json
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
 
-from test_e2e_workflow import run_integration_tests
+import orjson
+
+from test_e2e_workflow import SAMPLE_IMAGES, run_integration_tests
 from test_edge_cases import run_edge_case_tests
 
 
@@ -34,7 +36,7 @@ def generate_test_report(
     output_file: Path
 ):
     """Generate JSON test report."""
-    duration = time.time() - start_time
+    duration = time.perf_counter() - start_time
 
     report = {
         "timestamp": datetime.now().isoformat(),
@@ -56,12 +58,20 @@ def generate_test_report(
         }
     }
 
-    with open(output_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
 
     print(f"\n📊 Test report saved to: {output_file}")
 
 
+def positive_int(value: str) -> int:
+    """argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Run all integration tests."""
     parser = argparse.ArgumentParser(
@@ -77,6 +87,12 @@ def main():
         action='store_true',
         help='Verbose output'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=positive_int,
+        default=1,
+        help='Number of sample images uploaded in the end-to-end scan (default: 1)'
+    )
     parser.add_argument(
         '--e2e-only',
         action='store_true',
@@ -90,15 +106,22 @@ def main():
 
     args = parser.parse_args()
 
+    if args.batch_size > len(SAMPLE_IMAGES):
+        print(
+            f"⚠️  --batch-size {args.batch_size} exceeds the {len(SAMPLE_IMAGES)} "
+            f"sample images; only {len(SAMPLE_IMAGES)} will be uploaded"
+        )
+
     print("="*70)
     print(" "*15 + "SCOUT BADGE INVENTORY")
     print(" "*15 + "INTEGRATION TEST SUITE")
     print("="*70)
-    print(f"\nStart time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    start_dt = datetime.now()
+    print(f"\nStart time: {start_dt.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Quick mode: {'ON' if args.quick else 'OFF'}")
     print()
 
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Run test suites
     e2e_passed = True
@@ -108,16 +131,16 @@ def main():
         print("\n" + "▶"*35)
         print("RUNNING END-TO-END TESTS")
         print("▶"*35)
-        e2e_passed = run_integration_tests()
+        e2e_passed = run_integration_tests(batch_size=args.batch_size, quick=args.quick)
 
     if not args.e2e_only:
         print("\n" + "▶"*35)
         print("RUNNING EDGE CASE TESTS")
         print("▶"*35)
-        edge_passed = run_edge_case_tests()
+        edge_passed = run_edge_case_tests(quick=args.quick)
 
     # Generate report
-    duration = time.time() - start_time
+    duration = time.perf_counter() - start_time
 
     print("\n" + "="*70)
     print(" "*25 + "FINAL RESULTS")
@@ -141,7 +164,8 @@ def main():
     # Save report
     report_dir = Path(__file__).parent / "reports"
     report_dir.mkdir(exist_ok=True)
-    report_file = report_dir / f"test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # Name the report after the run's start time, captured above
+    report_file = report_dir / f"test_report_{start_dt.strftime('%Y%m%d_%H%M%S')}.json"
 
     generate_test_report(e2e_passed, edge_passed, start_time, report_file)
 
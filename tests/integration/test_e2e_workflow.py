@@ -23,6 +23,9 @@ import asyncio
 import json
 import os
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -35,34 +38,64 @@ from urllib3.util.retry import Retry
 BASE_URL = "http://localhost:8000"
 API_TIMEOUT = 30  # seconds
 PROCESSING_TIMEOUT = 600  # 10 minutes for Ollama processing
-POLL_INTERVAL = 2  # seconds
+INITIAL_POLL_INTERVAL = 0.1  # seconds, grows by POLL_BACKOFF_FACTOR each poll
+MAX_POLL_INTERVAL = 5.0  # seconds
+POLL_BACKOFF_FACTOR = 1.5
+POOL_MAXSIZE = 16  # keep-alive connections kept open to the backend
 
 # Test data paths
 TEST_DIR = Path(__file__).parent.parent
 SAMPLE_IMAGES_DIR = TEST_DIR / "sample_badges"
 
+# Sample images, listed once per run and shared with the edge case tests
+SAMPLE_IMAGES = sorted(SAMPLE_IMAGES_DIR.glob("*.jpeg"))
+
+
+def _create_session(retries: bool = True) -> requests.Session:
+    """
+    Create a pooled keep-alive session.
+
+    Args:
+        retries: If False, never retry, so error-path probes fail fast and
+            uploads are never sent twice
+    """
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=1,
+        # Spread out retries from the concurrent edge cases
+        backoff_jitter=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE"]
+    ) if retries else Retry(total=0, raise_on_status=False)
+    # All tests talk to one host; size its pool for the concurrent edge cases
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=1,
+        pool_maxsize=POOL_MAXSIZE
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+# One session for every client, so both suites reuse the same keep-alive pool
+_SHARED_SESSION = _create_session()
+
 
 class IntegrationTestClient:
     """HTTP client for integration testing with retry logic."""
 
-    def __init__(self, base_url: str = BASE_URL, timeout: int = API_TIMEOUT):
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: int = API_TIMEOUT,
+        session: Optional[requests.Session] = None
+    ):
         self.base_url = base_url
         self.timeout = timeout
-        self.session = self._create_session()
-
-    def _create_session(self) -> requests.Session:
-        """Create session with retry logic."""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+        self.session = session or _SHARED_SESSION
 
     def health_check(self) -> bool:
         """Check if backend is running."""
@@ -203,15 +236,22 @@ class IntegrationTestClient:
         self,
         scan_id: int,
         timeout: int = PROCESSING_TIMEOUT,
-        poll_interval: int = POLL_INTERVAL
+        initial_interval: float = INITIAL_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL
     ) -> bool:
-        """Wait for processing to complete, polling for status."""
+        """
+        Wait for processing to complete, polling for status.
+
+        Status is checked before the first sleep, then polled with exponential
+        backoff so short scans finish quickly and long ones are polled rarely.
+        """
         print(f"⏳ Waiting for scan {scan_id} to complete processing...")
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         last_status = None
+        poll_interval = initial_interval
 
-        while time.time() - start_time < timeout:
+        while time.perf_counter() - start_time < timeout:
             status_data = self.get_processing_status(scan_id)
 
             if status_data:
@@ -229,14 +269,16 @@ class IntegrationTestClient:
 
                 # Check completion
                 if status == 'completed':
-                    elapsed = time.time() - start_time
+                    elapsed = time.perf_counter() - start_time
                     print(f"✅ Processing completed in {elapsed:.1f} seconds")
                     return True
                 elif status == 'failed':
                     print(f"❌ Processing failed")
                     return False
 
-            time.sleep(poll_interval)
+            remaining = timeout - (time.perf_counter() - start_time)
+            time.sleep(max(0, min(poll_interval, remaining)))
+            poll_interval = min(poll_interval * POLL_BACKOFF_FACTOR, max_interval)
 
         print(f"❌ Processing timeout after {timeout} seconds")
         return False
@@ -249,6 +291,7 @@ class TestResults:
         self.tests_run = 0
         self.tests_passed = 0
         self.tests_failed = 0
+        self.tests_skipped = 0
         self.failures = []
 
     def add_result(self, test_name: str, passed: bool, message: str = ""):
@@ -264,6 +307,13 @@ class TestResults:
             if message:
                 print(f"   {message}")
 
+    def add_skip(self, test_name: str, reason: str = ""):
+        """Record a test that was deliberately not run."""
+        self.tests_skipped += 1
+        print(f"⏭️  SKIP: {test_name}")
+        if reason:
+            print(f"   {reason}")
+
     def print_summary(self):
         """Print test summary."""
         print("\n" + "="*60)
@@ -272,6 +322,8 @@ class TestResults:
         print(f"Total Tests: {self.tests_run}")
         print(f"Passed: {self.tests_passed}")
         print(f"Failed: {self.tests_failed}")
+        if self.tests_skipped:
+            print(f"Skipped: {self.tests_skipped}")
 
         if self.failures:
             print("\nFAILURES:")
@@ -297,12 +349,16 @@ def test_backend_health(client: IntegrationTestClient, results: TestResults):
     return is_healthy
 
 
-def test_image_upload(client: IntegrationTestClient, results: TestResults) -> Optional[int]:
-    """Test 2: Image upload workflow."""
+def test_image_upload(
+    client: IntegrationTestClient,
+    results: TestResults,
+    batch_size: int = 1
+) -> Optional[int]:
+    """Test 2: Image upload workflow (batch_size images in a single scan)."""
     print("\n📋 Test 2: Image Upload")
 
     # Get sample images
-    sample_images = list(SAMPLE_IMAGES_DIR.glob("*.jpeg"))[:1]  # Start with 1 image
+    sample_images = SAMPLE_IMAGES[:batch_size]
 
     if not sample_images:
         results.add_result("Image Upload", False, "No sample images found")
@@ -405,26 +461,24 @@ def test_inventory_operations(
     print(f"   Initial inventory: {initial_stats.get('total_badge_types', 0)} types, "
           f"{initial_stats.get('total_quantity', 0)} badges")
 
-    # Preview inventory update - extract detections from results array
-    all_detections = []
-    for result in processing_results.get('results', []):
-        all_detections.extend(result.get('detections', []))
-
-    if all_detections:
-        # Create badge updates from detections
-        badge_updates = {}
-        for detection in all_detections:
-            badge_id = detection.get('badge_id')
-            quantity = detection.get('quantity', 1)
-            if badge_id:
-                badge_updates[badge_id] = badge_updates.get(badge_id, 0) + quantity
+    # Preview inventory update - create badge updates from the detections
+    # of every entry in the results array, in a single pass
+    detections = chain.from_iterable(
+        result.get('detections', []) for result in processing_results.get('results', [])
+    )
+    badge_updates = Counter()
+    for detection in detections:
+        badge_id = detection.get('badge_id')
+        if badge_id:
+            badge_updates[badge_id] += detection.get('quantity', 1)
 
+    if badge_updates:
         print(f"   Badge updates to apply: {len(badge_updates)} unique badges")
 
         # Preview update
         preview_result = client.update_inventory_from_scan(
             scan_id,
-            badge_updates,
+            dict(badge_updates),
             preview=True
         )
 
@@ -446,12 +500,18 @@ def test_inventory_operations(
         # )
 
 
-def test_edge_cases(client: IntegrationTestClient, results: TestResults):
-    """Test 6: Edge cases and error handling."""
+def test_edge_cases(client: IntegrationTestClient, results: TestResults, quick: bool = False):
+    """Test 6: Edge cases and error handling (category filter skipped when quick)."""
     print("\n📋 Test 6: Edge Cases")
 
+    # The probes are independent; issue them concurrently over the session pool
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        invalid_future = executor.submit(client.get_processing_results, 999999)
+        low_stock_future = executor.submit(client.get_inventory, low_stock_only=True)
+        oas_future = None if quick else executor.submit(client.get_inventory, category="OAS")
+
     # Test invalid scan_id
-    invalid_results = client.get_processing_results(999999)
+    invalid_results = invalid_future.result()
     results.add_result(
         "Invalid Scan ID Handling",
         invalid_results is None,  # Should return None or error
@@ -459,7 +519,7 @@ def test_edge_cases(client: IntegrationTestClient, results: TestResults):
     )
 
     # Test inventory filtering
-    low_stock = client.get_inventory(low_stock_only=True)
+    low_stock = low_stock_future.result()
     results.add_result(
         "Low Stock Filter",
         low_stock is not None,
@@ -469,8 +529,12 @@ def test_edge_cases(client: IntegrationTestClient, results: TestResults):
     if low_stock is not None:
         print(f"   Low stock items: {len(low_stock)}")
 
+    if oas_future is None:
+        results.add_skip("Category Filter", "Skipped in quick mode")
+        return
+
     # Test category filtering
-    oas_badges = client.get_inventory(category="OAS")
+    oas_badges = oas_future.result()
     results.add_result(
         "Category Filter",
         oas_badges is not None,
@@ -481,8 +545,15 @@ def test_edge_cases(client: IntegrationTestClient, results: TestResults):
         print(f"   OAS badges: {len(oas_badges)}")
 
 
-def run_integration_tests():
-    """Run all integration tests."""
+def run_integration_tests(batch_size: int = 1, quick: bool = False):
+    """
+    Run all integration tests.
+
+    Args:
+        batch_size: Number of sample images uploaded and processed in one scan
+        quick: If True, skip the Ollama processing, results and inventory
+            steps and the optional checks
+    """
     print("="*60)
     print("SCOUT BADGE INVENTORY - INTEGRATION TESTS")
     print("="*60)
@@ -498,28 +569,35 @@ def run_integration_tests():
         return False
 
     # Test 2: Upload
-    scan_id = test_image_upload(client, results)
+    scan_id = test_image_upload(client, results, batch_size)
     if not scan_id:
         print("\n❌ Cannot proceed without successful upload")
         results.print_summary()
         return False
 
-    # Test 3: Processing
-    processing_completed = test_processing_workflow(client, results, scan_id)
-    if not processing_completed:
-        print("\n❌ Processing failed or timed out")
-        results.print_summary()
-        return False
+    if quick:
+        # Ollama takes ~100s per image, far longer than a quick run allows
+        reason = "Skipped in quick mode (Ollama processing)"
+        results.add_skip("AI Processing Workflow", reason)
+        results.add_skip("Results Retrieval", reason)
+        results.add_skip("Inventory Operations", reason)
+    else:
+        # Test 3: Processing
+        processing_completed = test_processing_workflow(client, results, scan_id)
+        if not processing_completed:
+            print("\n❌ Processing failed or timed out")
+            results.print_summary()
+            return False
 
-    # Test 4: Results
-    processing_results = test_results_retrieval(client, results, scan_id)
+        # Test 4: Results
+        processing_results = test_results_retrieval(client, results, scan_id)
 
-    # Test 5: Inventory
-    if processing_results:
-        test_inventory_operations(client, results, scan_id, processing_results)
+        # Test 5: Inventory
+        if processing_results:
+            test_inventory_operations(client, results, scan_id, processing_results)
 
     # Test 6: Edge cases
-    test_edge_cases(client, results)
+    test_edge_cases(client, results, quick)
 
     # Summary
     return results.print_summary()
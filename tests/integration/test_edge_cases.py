@@ -7,29 +7,52 @@ Usage:
     python tests/integration/test_edge_cases.py
 """
 
+import functools
 import io
 import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
-import requests
 from PIL import Image
 
-from test_e2e_workflow import IntegrationTestClient, TestResults
+from test_e2e_workflow import SAMPLE_IMAGES, IntegrationTestClient, TestResults, _create_session
 
 
-BASE_URL = "http://localhost:8000"
-TEST_DIR = Path(__file__).parent.parent
-SAMPLE_IMAGES_DIR = TEST_DIR / "sample_badges"
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # backend UploadConfig.MAX_FILE_SIZE default
+HTTP_TIMEOUT = (3, 15)  # (connect, read) seconds for direct API calls
+# Seconds to wait for all concurrent uploads; above one upload's worst case
+# with session retries (4 attempts of API_TIMEOUT=30s plus backoff)
+CONCURRENT_UPLOAD_TIMEOUT = 150
+RAPID_CALL_COUNT = 50
+RAPID_CALL_WORKERS = 10
 
+# Direct probes of error paths must not be retried: a retried POST/PUT could
+# repeat an upload, and a down backend should be reported immediately
+_PROBE_SESSION = _create_session(retries=False)
 
-def create_test_image(width: int, height: int, color: tuple = (128, 128, 128)) -> io.BytesIO:
-    """Create a test image in memory."""
+
+@functools.lru_cache(maxsize=8)
+def _encode_jpeg_bytes(width: int, height: int, color: tuple) -> bytes:
+    """Encode a solid-colour JPEG once per (width, height, color)."""
     img = Image.new('RGB', (width, height), color)
     img_bytes = io.BytesIO()
-    img.save(img_bytes, format='JPEG')
-    img_bytes.seek(0)
-    return img_bytes
+    img.save(img_bytes, format='JPEG', quality=75, optimize=False)
+    return img_bytes.getvalue()
+
+
+def create_test_image(width: int, height: int, color: tuple = (128, 128, 128)) -> io.BytesIO:
+    """Create a test image in memory (a fresh stream over cached JPEG bytes)."""
+    return io.BytesIO(_encode_jpeg_bytes(width, height, color))
+
+
+def create_oversized_blob(size_bytes: int) -> io.BytesIO:
+    """
+    Create a payload of the given size that starts with a JPEG SOI marker.
+
+    It is not a decodable image; it only needs to look like a JPEG long
+    enough for the server's size check to reject it.
+    """
+    return io.BytesIO(b'\xff\xd8\xff\xe0' + bytes(size_bytes - 4))
 
 
 def test_large_batch_upload(client: IntegrationTestClient, results: TestResults):
@@ -37,7 +60,7 @@ def test_large_batch_upload(client: IntegrationTestClient, results: TestResults)
     print("\n📋 Edge Case 1: Large Batch Upload (20 images)")
 
     # Get all sample images and repeat if needed
-    sample_images = list(SAMPLE_IMAGES_DIR.glob("*.jpeg"))
+    sample_images = SAMPLE_IMAGES
 
     if not sample_images:
         results.add_result("Large Batch Upload", False, "No sample images available")
@@ -49,9 +72,9 @@ def test_large_batch_upload(client: IntegrationTestClient, results: TestResults)
         test_images.append(sample_images[i % len(sample_images)])
 
     print(f"   Uploading {len(test_images)} images...")
-    start_time = time.time()
+    start_time = time.perf_counter()
     scan_id = client.upload_images(test_images)
-    upload_time = time.time() - start_time
+    upload_time = time.perf_counter() - start_time
 
     results.add_result(
         "Large Batch Upload (20 images)",
@@ -69,15 +92,19 @@ def test_oversized_file(client: IntegrationTestClient, results: TestResults):
     """Test uploading file larger than limit (>10MB)."""
     print("\n📋 Edge Case 2: Oversized File (>10MB)")
 
-    # Create a large image (should be rejected)
-    large_image = create_test_image(5000, 5000)  # ~75MB uncompressed
+    # Create a payload over the upload limit (should be rejected); a flat
+    # JPEG compresses far below the limit, so no real image is encoded
+    large_image = create_oversized_blob(MAX_UPLOAD_SIZE + 2 * 1024 * 1024)
 
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/upload",
+        response = _PROBE_SESSION.post(
+            f"{client.base_url}/api/upload",
             files=[('files', ('large.jpg', large_image, 'image/jpeg'))],
-            timeout=10
+            timeout=HTTP_TIMEOUT,
+            stream=True
         )
+        # Only the status code matters; skip reading the error body
+        response.close()
 
         # Should be rejected (400 or 413)
         rejected = response.status_code in [400, 413, 422]
@@ -101,11 +128,13 @@ def test_invalid_file_type(client: IntegrationTestClient, results: TestResults):
     fake_image = io.BytesIO(b"This is not an image file")
 
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/upload",
+        response = _PROBE_SESSION.post(
+            f"{client.base_url}/api/upload",
             files=[('files', ('fake.txt', fake_image, 'text/plain'))],
-            timeout=10
+            timeout=HTTP_TIMEOUT,
+            stream=True
         )
+        response.close()
 
         # Should be rejected (400 or 415)
         rejected = response.status_code in [400, 415, 422]
@@ -126,11 +155,13 @@ def test_empty_upload(client: IntegrationTestClient, results: TestResults):
     print("\n📋 Edge Case 4: Empty Upload")
 
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/upload",
+        response = _PROBE_SESSION.post(
+            f"{client.base_url}/api/upload",
             files=[],
-            timeout=10
+            timeout=HTTP_TIMEOUT,
+            stream=True
         )
+        response.close()
 
         # Should be rejected (400 or 422)
         rejected = response.status_code in [400, 422]
@@ -154,10 +185,10 @@ def test_poor_quality_image(client: IntegrationTestClient, results: TestResults)
     tiny_image = create_test_image(100, 100)
 
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/upload",
+        response = _PROBE_SESSION.post(
+            f"{client.base_url}/api/upload",
             files=[('files', ('tiny.jpg', tiny_image, 'image/jpeg'))],
-            timeout=10
+            timeout=HTTP_TIMEOUT
         )
 
         # May accept but should handle gracefully
@@ -190,7 +221,7 @@ def test_concurrent_uploads(client: IntegrationTestClient, results: TestResults)
     """Test multiple concurrent upload requests."""
     print("\n📋 Edge Case 6: Concurrent Uploads")
 
-    sample_images = list(SAMPLE_IMAGES_DIR.glob("*.jpeg"))[:1]
+    sample_images = SAMPLE_IMAGES[:1]
 
     if not sample_images:
         results.add_result("Concurrent Uploads", False, "No sample images")
@@ -202,10 +233,23 @@ def test_concurrent_uploads(client: IntegrationTestClient, results: TestResults)
     def upload_task():
         return client.upload_images(sample_images)
 
-    scan_ids = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        futures = [executor.submit(upload_task) for _ in range(3)]
-        scan_ids = [f.result() for f in concurrent.futures.as_completed(futures)]
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+    futures = [executor.submit(upload_task) for _ in range(3)]
+    try:
+        scan_ids = [
+            f.result()
+            for f in concurrent.futures.as_completed(futures, timeout=CONCURRENT_UPLOAD_TIMEOUT)
+        ]
+    except concurrent.futures.TimeoutError:
+        # Don't block on the stuck uploads; they finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+        results.add_result(
+            "Concurrent Uploads",
+            False,
+            f"Uploads did not finish within {CONCURRENT_UPLOAD_TIMEOUT}s"
+        )
+        return
+    executor.shutdown()
 
     # All should succeed
     all_succeeded = all(scan_id is not None for scan_id in scan_ids)
@@ -225,7 +269,7 @@ def test_duplicate_processing(client: IntegrationTestClient, results: TestResult
     """Test starting processing on same scan twice."""
     print("\n📋 Edge Case 7: Duplicate Processing Request")
 
-    sample_images = list(SAMPLE_IMAGES_DIR.glob("*.jpeg"))[:1]
+    sample_images = SAMPLE_IMAGES[:1]
 
     if not sample_images:
         results.add_result("Duplicate Processing", False, "No sample images")
@@ -256,13 +300,26 @@ def test_invalid_inventory_update(client: IntegrationTestClient, results: TestRe
     """Test inventory update with invalid data."""
     print("\n📋 Edge Case 8: Invalid Inventory Update")
 
-    try:
-        # Try to update non-existent badge
-        response = requests.put(
-            f"{BASE_URL}/api/inventory/invalid-badge-id",
-            json={"quantity": 10},
-            timeout=10
+    def put_quantity(badge_id: str, quantity: int):
+        response = _PROBE_SESSION.put(
+            f"{client.base_url}/api/inventory/{badge_id}",
+            json={"quantity": quantity},
+            timeout=HTTP_TIMEOUT,
+            stream=True
         )
+        # Only the status code matters; skip reading the error body
+        response.close()
+        return response
+
+    try:
+        # The two checks are independent, so send them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Try to update non-existent badge
+            missing_future = executor.submit(put_quantity, "invalid-badge-id", 10)
+            # Try negative quantity
+            negative_future = executor.submit(put_quantity, "grey-wolf-award", -5)
+
+        response = missing_future.result()
 
         # Should return 404
         correct_error = response.status_code == 404
@@ -273,12 +330,7 @@ def test_invalid_inventory_update(client: IntegrationTestClient, results: TestRe
             f"Expected 404, got {response.status_code}"
         )
 
-        # Try negative quantity
-        response = requests.put(
-            f"{BASE_URL}/api/inventory/grey-wolf-award",
-            json={"quantity": -5},
-            timeout=10
-        )
+        response = negative_future.result()
 
         # Should return 400 or 422
         correct_error = response.status_code in [400, 422]
@@ -297,25 +349,21 @@ def test_api_rate_limiting(client: IntegrationTestClient, results: TestResults):
     """Test rapid successive API calls."""
     print("\n📋 Edge Case 9: Rapid API Calls")
 
-    # Make 50 rapid requests to inventory endpoint
-    success_count = 0
-    rate_limited = False
+    # Fire the requests concurrently over the shared connection pool
+    with ThreadPoolExecutor(max_workers=RAPID_CALL_WORKERS) as executor:
+        responses = list(executor.map(lambda _: client.get_inventory(), range(RAPID_CALL_COUNT)))
 
-    for i in range(50):
-        response = client.get_inventory()
-        if response is not None:
-            success_count += 1
-        else:
-            rate_limited = True
+    success_count = sum(r is not None for r in responses)
+    rate_limited = success_count < RAPID_CALL_COUNT
 
     # Should either handle all or implement rate limiting
     results.add_result(
         "Rapid API Calls",
         True,  # Pass as long as it doesn't crash
-        f"Handled {success_count}/50 requests, rate limited: {rate_limited}"
+        f"Handled {success_count}/{RAPID_CALL_COUNT} requests, rate limited: {rate_limited}"
     )
 
-    print(f"   ✅ Handled {success_count}/50 requests")
+    print(f"   ✅ Handled {success_count}/{RAPID_CALL_COUNT} requests")
 
 
 def test_database_consistency(client: IntegrationTestClient, results: TestResults):
@@ -328,20 +376,28 @@ def test_database_consistency(client: IntegrationTestClient, results: TestResult
     inv2 = client.get_inventory()
 
     if inv1 and inv2:
-        # Should be identical
-        consistent = len(inv1) == len(inv2)
+        # Should be identical, item for item
+        state1 = {(item['id'], item['quantity']) for item in inv1}
+        state2 = {(item['id'], item['quantity']) for item in inv2}
+        consistent = state1 == state2
 
         results.add_result(
             "Database Consistency",
             consistent,
-            f"First: {len(inv1)} items, Second: {len(inv2)} items"
+            f"First: {len(inv1)} items, Second: {len(inv2)} items, "
+            f"{len(state1 ^ state2)} differing entries"
         )
     else:
         results.add_result("Database Consistency", False, "Failed to fetch inventory")
 
 
-def run_edge_case_tests():
-    """Run all edge case tests."""
+def run_edge_case_tests(quick: bool = False):
+    """
+    Run all edge case tests.
+
+    Args:
+        quick: If True, skip the long-running batch upload and rapid call tests
+    """
     print("="*60)
     print("SCOUT BADGE INVENTORY - EDGE CASE TESTS")
     print("="*60)
@@ -356,7 +412,10 @@ def run_edge_case_tests():
         return False
 
     # Run edge case tests
-    test_large_batch_upload(client, results)
+    if quick:
+        results.add_skip("Large Batch Upload", "Skipped in quick mode")
+    else:
+        test_large_batch_upload(client, results)
     test_oversized_file(client, results)
     test_invalid_file_type(client, results)
     test_empty_upload(client, results)
@@ -364,7 +423,10 @@ def run_edge_case_tests():
     test_concurrent_uploads(client, results)
     test_duplicate_processing(client, results)
     test_invalid_inventory_update(client, results)
-    test_api_rate_limiting(client, results)
+    if quick:
+        results.add_skip("Rapid API Calls", "Skipped in quick mode")
+    else:
+        test_api_rate_limiting(client, results)
     test_database_consistency(client, results)
 
     # Summary
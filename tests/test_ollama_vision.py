@@ -13,6 +13,22 @@ from typing import Dict, List, Optional, Tuple
 import ollama
 
 
+# Keep the model loaded between prompts so each test measures inference only
+MODEL_KEEP_ALIVE = "30m"
+
+# Upper bound on a single Ollama call, including streaming the whole
+# response; llava:7b takes ~100s per image
+OLLAMA_TIMEOUT = 300  # seconds
+
+ollama_client = ollama.Client(timeout=OLLAMA_TIMEOUT)
+
+# Retries when the server reports it is busy (HTTP 429/503)
+OVERLOAD_STATUS_CODES = (429, 503)
+MAX_OVERLOAD_RETRIES = 3
+
+# Image formats picked up from the test images directory
+IMAGE_EXTS = {".jpeg", ".jpg", ".png"}
+
 # Test prompt templates
 PROMPTS = {
     "basic": "What Scout badges do you see in this image?",
@@ -55,11 +71,35 @@ Identify each type of badge you see and count how many of each.""",
 }
 
 
+def warm_up_model(model: str = "llava:7b") -> float:
+    """
+    Load the model into memory before timing any prompts.
+
+    Args:
+        model: Ollama model name
+
+    Returns:
+        Load time in seconds
+    """
+    print(f"Loading model {model}...")
+    start_time = time.perf_counter()
+    try:
+        # An empty prompt loads the model without generating anything
+        ollama_client.generate(model=model, prompt="", keep_alive=MODEL_KEEP_ALIVE)
+        load_time = time.perf_counter() - start_time
+        print(f"Model loaded in {load_time:.2f}s")
+    except Exception as e:
+        load_time = time.perf_counter() - start_time
+        print(f"Warning: model warm-up failed: {str(e)}")
+    return load_time
+
+
 def test_badge_recognition(
     image_path: Path,
     prompt: str,
-    model: str = "llava:7b"
-) -> Tuple[str, float]:
+    model: str = "llava:7b",
+    image_bytes: Optional[bytes] = None
+) -> Tuple[str, float, bool]:
     """
     Test badge recognition with a specific prompt.
 
@@ -67,9 +107,11 @@ def test_badge_recognition(
         image_path: Path to the badge image
         prompt: Prompt template to use
         model: Ollama model name
+        image_bytes: Preloaded image contents; read from image_path if omitted
 
     Returns:
-        Tuple of (response text, response time in seconds)
+        Tuple of (response text, response time in seconds, whether the
+        response was cut off at OLLAMA_TIMEOUT)
     """
     print(f"\n{'='*60}")
     print(f"Testing: {image_path.name}")
@@ -77,33 +119,56 @@ def test_badge_recognition(
     print(f"Prompt: {prompt[:50]}...")
     print(f"{'='*60}")
 
-    start_time = time.time()
+    start_time = time.perf_counter()
+    truncated = False
 
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[{
-                'role': 'user',
-                'content': prompt,
-                'images': [str(image_path)]
-            }]
-        )
-
-        elapsed_time = time.time() - start_time
-        response_text = response['message']['content']
-
-        print(f"\nResponse (took {elapsed_time:.2f}s):")
+        for attempt in range(MAX_OVERLOAD_RETRIES + 1):
+            chunks = []
+            stream = ollama_client.chat(
+                model=model,
+                messages=[{
+                    'role': 'user',
+                    'content': prompt,
+                    'images': [image_bytes if image_bytes is not None else str(image_path)]
+                }],
+                keep_alive=MODEL_KEEP_ALIVE,
+                stream=True
+            )
+            try:
+                # Stream tokens so a runaway generation can be cut off at the deadline
+                for chunk in stream:
+                    chunks.append(chunk['message']['content'] or "")
+                    if time.perf_counter() - start_time > OLLAMA_TIMEOUT:
+                        print(f"Stopping generation after {OLLAMA_TIMEOUT}s")
+                        truncated = True
+                        break
+                break
+            except ollama.ResponseError as e:
+                if e.status_code not in OVERLOAD_STATUS_CODES or attempt == MAX_OVERLOAD_RETRIES:
+                    raise
+                # Only wait when the server asks us to
+                delay = min(2 ** attempt, 8)
+                print(f"Ollama busy ({e.status_code}), retrying in {delay}s...")
+                time.sleep(delay)
+            finally:
+                stream.close()
+
+        elapsed_time = time.perf_counter() - start_time
+        response_text = "".join(chunks)
+
+        print(f"\nResponse (took {elapsed_time:.2f}s{', truncated' if truncated else ''}):")
         print("-" * 60)
         print(response_text)
         print("-" * 60)
 
-        return response_text, elapsed_time
+        return response_text, elapsed_time, truncated
 
     except Exception as e:
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
         error_msg = f"Error: {str(e)}"
         print(f"\n{error_msg}")
-        return error_msg, elapsed_time
+        return error_msg, elapsed_time, False
 
 
 def run_comprehensive_tests(
@@ -116,7 +181,8 @@ def run_comprehensive_tests(
 
     Args:
         test_images_dir: Directory containing test images
-        output_file: Path to save results JSON
+        output_file: Path to save results JSON; per-prompt results are
+            also appended to a .jsonl sibling as each test finishes
         model: Ollama model to test
 
     Returns:
@@ -128,14 +194,17 @@ def run_comprehensive_tests(
     print(f"{'#'*60}\n")
 
     # Find all test images
-    image_files = list(test_images_dir.glob("*.jpeg")) + \
-                  list(test_images_dir.glob("*.jpg")) + \
-                  list(test_images_dir.glob("*.png"))
+    image_files = sorted(
+        p for p in test_images_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS
+    )
 
     print(f"Found {len(image_files)} test images:")
     for img in image_files:
         print(f"  - {img.name} ({img.stat().st_size / 1024 / 1024:.1f} MB)")
 
+    # Pay the model load once, outside the per-prompt timings
+    model_load_time = warm_up_model(model)
+
     results = {
         "model": model,
         "test_date": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -144,47 +213,62 @@ def run_comprehensive_tests(
         "tests": []
     }
 
-    # Test each image with each prompt
-    for image_path in image_files:
-        print(f"\n\n{'*'*60}")
-        print(f"* TESTING IMAGE: {image_path.name}")
-        print(f"{'*'*60}")
+    # Append each result as it completes so a crashed run keeps finished tests
+    progress_file = output_file.with_suffix(".jsonl")
+    total_time = 0.0
+    truncated_count = 0
+
+    with open(progress_file, 'w') as progress:
+        # Test each image with each prompt
+        for image_path in image_files:
+            print(f"\n\n{'*'*60}")
+            print(f"* TESTING IMAGE: {image_path.name}")
+            print(f"{'*'*60}")
+
+            image_results = {
+                "image": image_path.name,
+                "prompt_tests": {}
+            }
 
-        image_results = {
-            "image": image_path.name,
-            "prompt_tests": {}
-        }
+            # Read the image once and reuse it for every prompt
+            image_bytes = image_path.read_bytes()
 
-        for prompt_name, prompt_text in PROMPTS.items():
-            print(f"\n--- Testing prompt: {prompt_name} ---")
+            for prompt_name, prompt_text in PROMPTS.items():
+                print(f"\n--- Testing prompt: {prompt_name} ---")
 
-            response, elapsed_time = test_badge_recognition(
-                image_path, prompt_text, model
-            )
+                response, elapsed_time, truncated = test_badge_recognition(
+                    image_path, prompt_text, model, image_bytes
+                )
 
-            image_results["prompt_tests"][prompt_name] = {
-                "prompt": prompt_text,
-                "response": response,
-                "time_seconds": elapsed_time
-            }
+                image_results["prompt_tests"][prompt_name] = {
+                    "prompt": prompt_text,
+                    "response": response,
+                    "time_seconds": elapsed_time,
+                    "truncated": truncated
+                }
+                total_time += elapsed_time
+                truncated_count += truncated
 
-            # Brief pause between tests
-            time.sleep(1)
+                progress.write(json.dumps({
+                    "image": image_path.name,
+                    "prompt_name": prompt_name,
+                    "response": response,
+                    "time_seconds": elapsed_time,
+                    "truncated": truncated
+                }, separators=(',', ':')) + "\n")
+                progress.flush()
 
-        results["tests"].append(image_results)
+            results["tests"].append(image_results)
 
     # Calculate summary statistics
-    total_time = sum(
-        test["time_seconds"]
-        for img_result in results["tests"]
-        for test in img_result["prompt_tests"].values()
-    )
     avg_time = total_time / (len(image_files) * len(PROMPTS))
 
     results["summary"] = {
         "total_tests": len(image_files) * len(PROMPTS),
         "total_time_seconds": total_time,
-        "average_response_time_seconds": avg_time
+        "average_response_time_seconds": avg_time,
+        "model_load_time_seconds": model_load_time,
+        "truncated_responses": truncated_count
     }
 
     # Save results
@@ -198,6 +282,7 @@ def run_comprehensive_tests(
     print(f"Total time: {total_time:.2f} seconds")
     print(f"Average response time: {avg_time:.2f} seconds")
     print(f"Results saved to: {output_file}")
+    print(f"Per-prompt log: {progress_file}")
 
     return results
 
@@ -215,7 +300,7 @@ def quick_test(image_path: Path, model: str = "llava:7b"):
     print(f"{'='*60}")
 
     # Use the context-rich prompt as it's likely most effective
-    response, elapsed_time = test_badge_recognition(
+    response, elapsed_time, _ = test_badge_recognition(
         image_path,
         PROMPTS["context_rich"],
         model